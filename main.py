@@ -3,9 +3,6 @@ import asyncio
 import os
 from pathlib import Path
 
-from agent_framework_declarative import AgentFactory
-from agent_framework_devui import serve
-from azure.identity.aio import DefaultAzureCredential
 from dotenv import load_dotenv
 
 
@@ -14,6 +11,9 @@ load_dotenv()
 
 async def create_agent():
     """Create an agent from a declarative yaml specification."""
+    from agent_framework_declarative import AgentFactory
+    from azure.identity.aio import DefaultAzureCredential
+
     yaml_path = Path(__file__).parent / "agents" / "mslearnagent.yaml"
     project_endpoint = os.getenv("AZURE_FOUNDRY_PROJECT_ENDPOINT")
 
@@ -28,10 +28,12 @@ async def create_agent():
 
 
 if __name__ == "__main__":
+    from agent_framework_devui import serve
+
     agent = asyncio.run(create_agent())
     serve(
         entities=[agent], 
         host="localhost", 
         port=8000,
         auto_open=True
-    )
\ No newline at end of file
+    )
@@ -1,66 +1,148 @@
 """Deploy agent to Azure AI Foundry from YAML definition."""
 
+from __future__ import annotations
+
 import asyncio
 import os
 import sys
+import traceback
 from pathlib import Path
-from agent_framework_declarative import AgentFactory
-from azure.identity.aio import DefaultAzureCredential
+from typing import TYPE_CHECKING
+
+# Heavy SDK imports are deferred to the functions that use them
+if TYPE_CHECKING:
+    from agent_framework_declarative import AgentFactory
+    from azure.identity.aio import DefaultAzureCredential
+
+
+# Use uvloop's faster event loop where available
+try:
+    import uvloop
+    _run = uvloop.run
+except ImportError:
+    _run = asyncio.run
 
+_credential: DefaultAzureCredential | None = None
+
+
+async def get_credential() -> DefaultAzureCredential:
+    """Return the shared credential, creating it on first use."""
+    global _credential
+    if _credential is None:
+        from azure.identity.aio import DefaultAzureCredential
+        
+        _credential = DefaultAzureCredential()
+    return _credential
 
-async def deploy_agent(yaml_file: str) -> None:
+
+async def close_credential() -> None:
+    """Close the shared credential and its HTTP transport."""
+    global _credential
+    if _credential is not None:
+        await _credential.close()
+        _credential = None
+
+
+async def deploy_agent(yaml_file: str, factory: AgentFactory) -> bool:
     """
     Deploy an agent to Azure AI Foundry.
     
     Args:
         yaml_file: Path to the agent YAML definition file
+        factory: Factory configured for the target project
+    
+    Returns:
+        True if the agent was deployed
     """
     yaml_path = Path(yaml_file)
     
     if not yaml_path.exists():
         print(f"❌ Error: File not found: {yaml_file}")
-        sys.exit(1)
+        return False
+    
+    print(f"📦 Deploying agent from: {yaml_path.name}")
+    
+    try:
+        # Deploy agent (registers in Azure AI Foundry)
+        agent = factory.create_agent_from_yaml_path(yaml_path)
+        
+        print(f"✅ Agent deployed successfully!")
+        print(f"   Name: {agent.name}")
+        print(f"   Description: {agent.description or 'N/A'}")
+        print(f"\n🎉 Agent '{agent.name}' is now available in Azure AI Foundry")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Deployment of {yaml_path.name} failed: {e}")
+        if os.environ.get("MAFT_DEBUG"):
+            traceback.print_exc()
+        return False
+
+
+async def deploy_agents(yaml_files: list[str]) -> bool:
+    """
+    Deploy several agents with a shared credential and factory.
     
+    Args:
+        yaml_files: Paths to the agent YAML definition files
+    
+    Returns:
+        True if every agent was deployed
+    """
     project_endpoint = os.getenv("AZURE_FOUNDRY_PROJECT_ENDPOINT")
     
     if not project_endpoint:
         print("❌ Error: AZURE_FOUNDRY_PROJECT_ENDPOINT environment variable not set")
-        sys.exit(1)
+        return False
     
-    print(f"📦 Deploying agent from: {yaml_path.name}")
     print(f"🎯 Target project: {project_endpoint}")
     
     try:
-        # Create credentials
-        credential = DefaultAzureCredential()
+        # Reuse the shared credential
+        credential = await get_credential()
         
         # Create factory
+        from agent_framework_declarative import AgentFactory
+        
         factory = AgentFactory(
             client_kwargs={
                 "async_credential": credential,
                 "project_endpoint": project_endpoint
             }
         )
-        
-        # Deploy agent (registers in Azure AI Foundry)
-        agent = factory.create_agent_from_yaml_path(yaml_path)
-        
-        print(f"✅ Agent deployed successfully!")
-        print(f"   Name: {agent.name}")
-        print(f"   Description: {agent.description or 'N/A'}")
-        print(f"\n🎉 Agent '{agent.name}' is now available in Azure AI Foundry")
-        
     except Exception as e:
-        print(f"❌ Deployment failed: {e}")
-        import traceback
-        traceback.print_exc()
-        sys.exit(1)
+        print(f"❌ Deployment setup failed: {e}")
+        if os.environ.get("MAFT_DEBUG"):
+            traceback.print_exc()
+        return False
+    
+    failed = []
+    for yaml_file in yaml_files:
+        if not await deploy_agent(yaml_file, factory):
+            failed.append(yaml_file)
+    
+    if len(yaml_files) > 1:
+        print(f"\n📊 Deployed {len(yaml_files) - len(failed)}/{len(yaml_files)} agent(s)")
+        for yaml_file in failed:
+            print(f"   • Failed: {yaml_file}")
+    
+    return not failed
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python deploy_agent.py <path-to-agent.yaml>")
+    if len(sys.argv) < 2:
+        print("Usage: python deploy_agent.py <path-to-agent.yaml> [...]")
         print("Example: python deploy_agent.py agents/mslearnagent.yaml")
         sys.exit(1)
     
-    asyncio.run(deploy_agent(sys.argv[1]))
+    from dotenv import load_dotenv
+    
+    load_dotenv()
+    
+    async def main() -> bool:
+        try:
+            return await deploy_agents(sys.argv[1:])
+        finally:
+            await close_credential()
+    
+    sys.exit(0 if _run(main()) else 1)
@@ -1,26 +1,188 @@
 """Validate agent YAML against schema requirements."""
 
+import functools
+import io
 import sys
-import yaml
+from collections import deque
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import TYPE_CHECKING, List, Dict, Any, Tuple
+
+# yaml and jsonschema_rs are imported on first use so usage errors exit fast
+if TYPE_CHECKING:
+    import jsonschema_rs
+
+
+@functools.lru_cache(maxsize=None)
+def _yaml_loader():
+    """Return the libyaml-backed CSafeLoader, or SafeLoader if it is unavailable."""
+    try:
+        from yaml import CSafeLoader
+    except ImportError:
+        from yaml import SafeLoader as CSafeLoader
+    return CSafeLoader
+
+
+def _build_schema(kinds, connection_kinds, tool_kinds, tool_required) -> Dict[str, Any]:
+    """Build the JSON Schema for agent YAML files.
+    
+    Each node may carry an ``errorMessage`` mapping from a keyword to the
+    template used to report that keyword's failures in the validator's own
+    wording. Templates are formatted with ``field`` (missing property),
+    ``value`` (failing instance) and ``tool`` (1-based tool number).
+    
+    Sections and kinds that are present but falsy (``null``, ``""``, ``{}``,
+    ...) are treated as absent, as the validator always has.
+    """
+    falsy = {"enum": [None, False, 0, "", [], {}]}
+    
+    def when_truthy(schema):
+        return {"if": {"not": falsy}, "then": schema}
+    
+    def kind_field(enum, missing, invalid):
+        # A falsy kind is reported as missing rather than invalid
+        return {
+            "if": falsy,
+            "then": {"not": {}, "errorMessage": {"not": missing}},
+            "else": {"enum": list(enum), "errorMessage": {"enum": invalid}},
+        }
+    
+    def if_kind(kind, then):
+        return {"if": {"properties": {"kind": {"const": kind}}, "required": ["kind"]}, "then": then}
+    
+    connection_rules = [
+        ("remote", {"required": ["endpoint"]}, "'remote' connection requires 'endpoint'"),
+        ("key", {"anyOf": [{"required": ["apiKey"]}, {"required": ["key"]}]},
+         "'key' connection requires 'apiKey' or 'key'"),
+        ("reference", {"required": ["name"]}, "'reference' connection requires 'name'"),
+        ("anonymous", {"required": ["endpoint"]}, "'anonymous' connection requires 'endpoint'"),
+    ]
+    connection = {
+        "type": "object",
+        "required": ["kind"],
+        "errorMessage": {
+            "type": "'model.connection' must be a mapping",
+            "required": "Missing required field: 'model.connection.kind'",
+        },
+        "properties": {
+            "kind": kind_field(
+                connection_kinds,
+                "Missing required field: 'model.connection.kind'",
+                f"Invalid connection kind: '{{value}}' (must be one of {list(connection_kinds)})",
+            ),
+        },
+        "allOf": [
+            if_kind(kind, {**rule, "errorMessage": {keyword: message for keyword in rule}})
+            for kind, rule, message in connection_rules
+        ],
+    }
+    tool = {
+        "type": "object",
+        "required": ["kind"],
+        "errorMessage": {
+            "type": "Tool #{tool}: must be a mapping",
+            "required": "Tool #{tool}: Missing 'kind' field",
+        },
+        "properties": {
+            "kind": kind_field(
+                tool_kinds,
+                "Tool #{tool}: Missing 'kind' field",
+                f"Tool #{{tool}}: Invalid kind '{{value}}' (must be one of {list(tool_kinds)})",
+            ),
+        },
+        "allOf": [
+            if_kind(kind, {
+                "required": list(fields),
+                "errorMessage": {"required": f"Tool #{{tool}}: '{kind}' tool requires '{{field}}'"},
+            })
+            for kind, fields in tool_required.items()
+        ],
+    }
+    return {
+        "required": ["kind", "name"],
+        "errorMessage": {"required": "Missing required field: '{field}'"},
+        "properties": {
+            "kind": when_truthy({
+                "enum": list(kinds),
+                "errorMessage": {"enum": f"Invalid 'kind': '{{value}}' (must be one of {list(kinds)})"},
+            }),
+            "model": when_truthy({
+                "type": "object",
+                "required": ["id"],
+                "errorMessage": {
+                    "type": "'model' must be a mapping",
+                    "required": "Missing required field: 'model.id'",
+                },
+                "properties": {"connection": when_truthy(connection)},
+            }),
+            "tools": when_truthy({
+                "type": "array",
+                "errorMessage": {"type": "'tools' must be a list"},
+                "items": tool,
+            }),
+        },
+    }
 
 
 class AgentYAMLValidator:
     """Validator for agent YAML schema based on AGENT_YAML_SCHEMA.md"""
     
-    VALID_KINDS = ["Prompt", "Agent"]
-    VALID_CONNECTION_KINDS = ["remote", "key", "reference", "anonymous"]
-    VALID_TOOL_KINDS = [
+    VALID_KINDS = ("Prompt", "Agent")
+    VALID_CONNECTION_KINDS = ("remote", "key", "reference", "anonymous")
+    VALID_TOOL_KINDS = (
         "function", "web_search", "file_search", "code_interpreter",
         "mcp", "openapi", "custom"
-    ]
+    )
+    # Required fields per tool kind; kinds not listed have none
+    _TOOL_REQUIRED = {
+        "function": ("name", "description"),
+        "mcp": ("name", "url"),
+        "openapi": ("name", "specification"),
+        "custom": ("name",),
+    }
+    
+    _SCHEMA = _build_schema(
+        VALID_KINDS, VALID_CONNECTION_KINDS, VALID_TOOL_KINDS, _TOOL_REQUIRED
+    )
     
     def __init__(self, yaml_file: str):
         self.yaml_file = Path(yaml_file)
         self.errors: List[str] = []
         self.warnings: List[str] = []
         self.agent_data: Dict[str, Any] = {}
+        # Report text is buffered and written to stdout once by print_results
+        self._out = io.StringIO()
+    
+    def reset(self, yaml_file: str):
+        """Prepare the validator for another file, reusing its result lists."""
+        self.yaml_file = Path(yaml_file)
+        self.errors.clear()
+        self.warnings.clear()
+        self.agent_data = {}
+        self._out.seek(0)
+        self._out.truncate()
+    
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _compiled_schema(cls) -> "jsonschema_rs.Validator":
+        """Compile the schema on first use and share it across all files."""
+        import jsonschema_rs
+        
+        return jsonschema_rs.validator_for(cls._SCHEMA)
+    
+    @classmethod
+    def validate_files(cls, yaml_files: List[str]) -> bool:
+        """Validate and report several files. Returns True if all are valid."""
+        all_valid = True
+        validator = None
+        for yaml_file in yaml_files:
+            if validator is None:
+                validator = cls(yaml_file)
+            else:
+                validator.reset(yaml_file)
+            if not validator.validate():
+                all_valid = False
+            validator.print_results()
+        return all_valid
     
     def validate(self) -> bool:
         """Run all validations. Returns True if valid."""
@@ -29,119 +191,80 @@ class AgentYAMLValidator:
             self.errors.append(f"File not found: {self.yaml_file}")
             return False
         
+        import yaml
+        
         # Load YAML
         try:
-            with open(self.yaml_file) as f:
-                self.agent_data = yaml.safe_load(f)
+            with open(self.yaml_file, "rb") as f:
+                self.agent_data = yaml.load(f, Loader=_yaml_loader())
         except yaml.YAMLError as e:
             self.errors.append(f"Invalid YAML syntax: {e}")
             return False
         
+        if not isinstance(self.agent_data, dict):
+            self.errors.append("Top level of the YAML must be a mapping")
+            return False
+        
         # Run validations
-        self._validate_required_fields()
-        self._validate_kind()
-        self._validate_model()
-        self._validate_tools()
-        self._validate_azure_ai_restrictions()
-        self._check_powerfx_expressions()
+        self._validate_all()
         
         return len(self.errors) == 0
     
-    def _validate_required_fields(self):
-        """Check required top-level fields."""
-        required = ["kind", "name"]
-        for field in required:
-            if field not in self.agent_data:
-                self.errors.append(f"Missing required field: '{field}'")
-    
-    def _validate_kind(self):
-        """Validate 'kind' field."""
-        kind = self.agent_data.get("kind")
-        if kind and kind not in self.VALID_KINDS:
-            self.errors.append(
-                f"Invalid 'kind': '{kind}' (must be one of {self.VALID_KINDS})"
-            )
+    def _format_error(self, error: "jsonschema_rs.ValidationError") -> str:
+        """Convert a schema validation error into a validator message."""
+        node = self._SCHEMA
+        for part in error.schema_path[:-1]:
+            node = node[part]
+        template = node.get("errorMessage", {}).get(error.schema_path[-1])
+        if template is None:
+            location = ".".join(str(part) for part in error.instance_path)
+            return f"{location or 'root'}: {error.message}"
+        
+        path = error.instance_path
+        return template.format(
+            field=getattr(error.kind, "property", ""),
+            value=error.instance,
+            tool=path[1] + 1 if len(path) > 1 and path[0] == "tools" else "",
+        )
     
-    def _validate_model(self):
-        """Validate model configuration."""
-        model = self.agent_data.get("model")
-        if not model:
+    def _validate_all(self):
+        """Run every check in one pass over the parsed YAML.
+        
+        Structural rules are checked by the compiled schema; the remaining
+        checks are dispatched from a single depth-first walk of the tree.
+        """
+        for error in self._compiled_schema().iter_errors(self.agent_data):
+            self.errors.append(self._format_error(error))
+        
+        if not self.agent_data.get("model"):
             self.warnings.append("No 'model' section defined")
-            return
-        
-        # Check model.id
-        if "id" not in model:
-            self.errors.append("Missing required field: 'model.id'")
-        
-        # Check connection if present
-        connection = model.get("connection")
-        if connection:
-            conn_kind = connection.get("kind")
-            if not conn_kind:
-                self.errors.append("Missing required field: 'model.connection.kind'")
-            elif conn_kind not in self.VALID_CONNECTION_KINDS:
-                self.errors.append(
-                    f"Invalid connection kind: '{conn_kind}' "
-                    f"(must be one of {self.VALID_CONNECTION_KINDS})"
+        
+        expressions = []
+        
+        # Depth-first walk with an explicit stack; children are pushed in
+        # reverse so findings are reported in document order
+        stack = deque([(self.agent_data, "")])
+        while stack:
+            obj, path = stack.pop()
+            if isinstance(obj, dict):
+                if path == "model":
+                    self._validate_azure_ai_restrictions(obj)
+                stack.extend(
+                    (v, f"{path}.{k}" if path else k)
+                    for k, v in reversed(obj.items())
                 )
-            
-            # Validate connection-specific required fields
-            if conn_kind == "remote" and "endpoint" not in connection:
-                self.errors.append("'remote' connection requires 'endpoint'")
-            elif conn_kind == "key":
-                if "apiKey" not in connection and "key" not in connection:
-                    self.errors.append("'key' connection requires 'apiKey' or 'key'")
-            elif conn_kind == "reference" and "name" not in connection:
-                self.errors.append("'reference' connection requires 'name'")
-            elif conn_kind == "anonymous" and "endpoint" not in connection:
-                self.errors.append("'anonymous' connection requires 'endpoint'")
-    
-    def _validate_tools(self):
-        """Validate tools configuration."""
-        tools = self.agent_data.get("tools", [])
-        
-        for i, tool in enumerate(tools):
-            tool_kind = tool.get("kind")
-            
-            if not tool_kind:
-                self.errors.append(f"Tool #{i+1}: Missing 'kind' field")
-                continue
-            
-            if tool_kind not in self.VALID_TOOL_KINDS:
-                self.errors.append(
-                    f"Tool #{i+1}: Invalid kind '{tool_kind}' "
-                    f"(must be one of {self.VALID_TOOL_KINDS})"
+            elif isinstance(obj, list):
+                stack.extend(
+                    (obj[i], f"{path}[{i}]")
+                    for i in range(len(obj) - 1, -1, -1)
                 )
-            
-            # Tool-specific validations
-            if tool_kind == "function":
-                if "name" not in tool:
-                    self.errors.append(f"Tool #{i+1}: 'function' tool requires 'name'")
-                if "description" not in tool:
-                    self.errors.append(f"Tool #{i+1}: 'function' tool requires 'description'")
-            
-            elif tool_kind == "mcp":
-                if "name" not in tool:
-                    self.errors.append(f"Tool #{i+1}: 'mcp' tool requires 'name'")
-                if "url" not in tool:
-                    self.errors.append(f"Tool #{i+1}: 'mcp' tool requires 'url'")
-            
-            elif tool_kind == "openapi":
-                if "name" not in tool:
-                    self.errors.append(f"Tool #{i+1}: 'openapi' tool requires 'name'")
-                if "specification" not in tool:
-                    self.errors.append(f"Tool #{i+1}: 'openapi' tool requires 'specification'")
-            
-            elif tool_kind == "custom":
-                if "name" not in tool:
-                    self.errors.append(f"Tool #{i+1}: 'custom' tool requires 'name'")
-    
-    def _validate_azure_ai_restrictions(self):
-        """Validate Azure AI Foundry specific restrictions."""
-        model = self.agent_data.get("model")
-        if not model:
-            return
+            elif isinstance(obj, str) and obj.startswith("="):
+                expressions.append((path, obj))
         
+        self._report_powerfx_expressions(expressions)
+    
+    def _validate_azure_ai_restrictions(self, model: Dict[str, Any]):
+        """Validate Azure AI Foundry specific restrictions on the model section."""
         # Check if model.options is specified (not allowed for declarative agents)
         if "options" in model:
             self.errors.append(
@@ -154,63 +277,53 @@ class AgentYAMLValidator:
                 option_names = list(options.keys())
                 self.errors.append(f"  Found options: {', '.join(option_names)}")
     
-    def _check_powerfx_expressions(self):
-        """Find and report PowerFx expressions."""
-        expressions = []
-        
-        def find_expressions(obj, path=""):
-            if isinstance(obj, dict):
-                for k, v in obj.items():
-                    find_expressions(v, f"{path}.{k}" if path else k)
-            elif isinstance(obj, list):
-                for i, item in enumerate(obj):
-                    find_expressions(item, f"{path}[{i}]")
-            elif isinstance(obj, str) and obj.startswith("="):
-                expressions.append((path, obj))
-        
-        find_expressions(self.agent_data)
-        
+    def _report_powerfx_expressions(self, expressions: List[Tuple[str, str]]):
+        """Report PowerFx expressions found in the YAML."""
         if expressions:
-            print("\n📝 PowerFx expressions found:")
+            self._out.write("\n📝 PowerFx expressions found:\n")
             for path, expr in expressions:
-                print(f"   {path}: {expr}")
+                self._out.write(f"   {path}: {expr}\n")
                 # Extract environment variables
                 if expr.startswith("=Env."):
-                    var_name = expr.split("=Env.")[1].split(")")[0].split(",")[0]
-                    print(f"      → Requires env var: {var_name}")
+                    _, _, var_name = expr.partition("=Env.")
+                    var_name, _, _ = var_name.partition(")")
+                    var_name, _, _ = var_name.partition(",")
+                    self._out.write(f"      → Requires env var: {var_name}\n")
     
     def print_results(self):
         """Print validation results."""
-        print(f"\n{'='*60}")
-        print(f"Validating: {self.yaml_file.name}")
-        print(f"{'='*60}")
+        self._out.write(f"\n{'='*60}\n")
+        self._out.write(f"Validating: {self.yaml_file.name}\n")
+        self._out.write(f"{'='*60}\n")
         
         if self.errors:
-            print(f"\n❌ Validation FAILED with {len(self.errors)} error(s):")
+            self._out.write(f"\n❌ Validation FAILED with {len(self.errors)} error(s):\n")
             for error in self.errors:
-                print(f"   • {error}")
+                self._out.write(f"   • {error}\n")
         
         if self.warnings:
-            print(f"\n⚠️  {len(self.warnings)} warning(s):")
+            self._out.write(f"\n⚠️  {len(self.warnings)} warning(s):\n")
             for warning in self.warnings:
-                print(f"   • {warning}")
+                self._out.write(f"   • {warning}\n")
         
         if not self.errors:
-            print(f"\n✅ Validation PASSED!")
-            print(f"   Agent name: {self.agent_data.get('name')}")
-            print(f"   Agent kind: {self.agent_data.get('kind')}")
+            self._out.write("\n✅ Validation PASSED!\n")
+            self._out.write(f"   Agent name: {self.agent_data.get('name')}\n")
+            self._out.write(f"   Agent kind: {self.agent_data.get('kind')}\n")
             if 'description' in self.agent_data:
-                print(f"   Description: {self.agent_data.get('description')}")
+                self._out.write(f"   Description: {self.agent_data.get('description')}\n")
+        
+        sys.stdout.write(self._out.getvalue())
+        self._out.seek(0)
+        self._out.truncate()
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python validate_yaml.py <path-to-agent.yaml>")
-        print("Example: python validate_yaml.py agents/mslearnagent.yaml")
+    if len(sys.argv) < 2:
+        print("Usage: python validate_yaml.py <path-to-agent.yaml> [...]")
+        print("Example: python validate_yaml.py agents/*.yaml")
         sys.exit(1)
     
-    validator = AgentYAMLValidator(sys.argv[1])
-    is_valid = validator.validate()
-    validator.print_results()
+    is_valid = AgentYAMLValidator.validate_files(sys.argv[1:])
     
     sys.exit(0 if is_valid else 1)